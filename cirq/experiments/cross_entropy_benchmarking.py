@@ -1,8 +1,12 @@
 from typing import List, Set, Tuple, Sequence, Dict, Any, NamedTuple, Union
-from typing import Iterable
+from typing import Container, Iterable, Iterator, Optional
+import functools
+import itertools
+import multiprocessing.dummy as dummy
+import networkx
 import numpy as np
 from matplotlib import pyplot as plt
-from cirq import devices, ops, circuits, sim, work
+from cirq import devices, ops, circuits, protocols, sim, work
 
 CrossEntropyPair = NamedTuple('CrossEntropyPair', [('num_cycle', int),
                                                    ('xeb_fidelity', float)])
@@ -19,7 +23,14 @@ class CrossEntropyResult:
                 depth as the number of cycles and xeb_fidelity which returns
                 the XEB fidelity after the given cycle number.
         """
-        self._data = cross_entropy_pairs
+        self._num_cycles = np.fromiter(
+            (d.num_cycle for d in cross_entropy_pairs),
+            dtype=int,
+            count=len(cross_entropy_pairs))
+        self._fidelities = np.fromiter(
+            (d.xeb_fidelity for d in cross_entropy_pairs),
+            dtype=float,
+            count=len(cross_entropy_pairs))
 
     @property
     def data(self) -> Sequence[CrossEntropyPair]:
@@ -28,7 +39,20 @@ class CrossEntropyResult:
         Each CrossEntropyPair is a NamedTuple that contains a cycle number and
         the corresponding XEB fidelity.
         """
-        return self._data
+        return [
+            CrossEntropyPair(c, f) for c, f in zip(self._num_cycles.tolist(),
+                                                   self._fidelities.tolist())
+        ]
+
+    @property
+    def num_cycles(self) -> np.ndarray:
+        """Returns a 1D array of the numbers of cycles."""
+        return self._num_cycles
+
+    @property
+    def fidelities(self) -> np.ndarray:
+        """Returns a 1D array of the XEB fidelities."""
+        return self._fidelities
 
     def plot(self, **plot_kwargs: Any) -> None:
         """Plots the average XEB fidelity vs the number of cycles.
@@ -36,12 +60,14 @@ class CrossEntropyResult:
         Args:
             **plot_kwargs: Arguments to be passed to 'matplotlib.pyplot.plot'.
         """
-        num_cycles = [d.num_cycle for d in self._data]
-        fidelities = [d.xeb_fidelity for d in self._data]
         fig = plt.figure()
         ax = plt.gca()
         ax.set_ylim([0, 1.1])
-        plt.plot(num_cycles, fidelities, 'ro-', figure=fig, **plot_kwargs)
+        plt.plot(self._num_cycles,
+                 self._fidelities,
+                 'ro-',
+                 figure=fig,
+                 **plot_kwargs)
         plt.xlabel('Number of Cycles', figure=fig)
         plt.ylabel('XEB Fidelity', figure=fig)
         fig.show()
@@ -57,6 +83,8 @@ def cross_entropy_benchmarking(
         cycles: Union[int, Iterable[int]] = range(2, 103, 10),
         scrambling_gates_per_cycle: List[List[ops.SingleQubitGate]] = None,
         simulator: sim.Simulator = None,
+        num_threads: int = 1,
+        rng: Optional[np.random.Generator] = None,
 ) -> CrossEntropyResult:
     r"""Cross-entropy benchmarking (XEB) of multiple qubits.
 
@@ -138,59 +166,94 @@ def cross_entropy_benchmarking(
             of one or more single-qubit gates).
         simulator: A simulator that calculates the bit-string probabilities
             of the ideal circuit. By default, this is set to sim.Simulator().
+        num_threads: The number of threads over which the random circuits are
+            distributed. Each thread generates, samples and simulates whole
+            circuits, so the sampler and the simulator must be thread safe.
+            By default, all circuits are run sequentially.
+        rng: The random number generator from which the random circuits are
+            drawn. For a given seed, the circuits don't depend on
+            num_threads. By default, a generator seeded from numpy's global
+            random state is used, so that np.random.seed also makes the
+            circuits reproducible.
 
     Returns:
         A CrossEntropyResult object that stores and plots the result.
     """
     simulator = sim.Simulator() if simulator is None else simulator
-    num_qubits = len(qubits)
+    if rng is None:
+        rng = np.random.default_rng(np.random.randint(2**31))
+    num_states = 1 << len(qubits)
 
     if isinstance(cycles, int):
         cycle_range = [cycles]
     else:
         cycle_range = list(cycles)
 
-    # These store the measured and simulated bit-string probabilities from
-    # all trials in two dictionaries. The keys of the dictionaries are the
-    # numbers of cycles. The values are 2D arrays with each row being the
-    # probabilities obtained from a single trial.
-    probs_meas = {
-        n: np.zeros((num_circuits, 2**num_qubits)) for n in cycle_range
-    }
-    probs_exp = {
-        n: np.zeros((num_circuits, 2**num_qubits)) for n in cycle_range
-    }
-
-    for k in range(num_circuits):
+    # These store the simulated bit-string probabilities and the measured
+    # data from all trials in 3D arrays. The first index runs over the
+    # numbers of cycles in cycle_range, the second over the trials and the
+    # third over the bit-strings. Single precision is far below the sampling
+    # noise of the measured probabilities and halves the memory traffic.
+    probs_exp = np.zeros((len(cycle_range), num_circuits, num_states),
+                         dtype=np.float32)
+    # When there are far fewer repetitions than bit-strings, the measured
+    # probabilities are mostly zero. In that case, the sampled bit-string
+    # indices are stored instead, with the third index running over the
+    # repetitions.
+    keep_bitstrings = repetitions < num_states / 4
+    if keep_bitstrings:
+        measured = np.zeros((len(cycle_range), num_circuits, repetitions),
+                            dtype=np.int64)
+    else:
+        measured = np.zeros_like(probs_exp)
 
+    def run_trial(k: int, rng: np.random.Generator) -> None:
         # Generates one random XEB circuit with max(num_cycle_range) cycles.
         # Then the first n cycles of the circuit are taken to generate
         # shorter circuits with n cycles (n taken from cycles). All of these
         # circuits are stored in circuits_k.
         circuits_k = _build_xeb_circuits(qubits, cycle_range,
                                          scrambling_gates_per_cycle,
-                                         benchmark_ops)
+                                         benchmark_ops, rng)
 
         # Run each circuit with the sampler to obtain a collection of
         # bit-strings, from which the bit-string probabilities are estimated.
-        probs_meas_k = _measure_prob_distribution(sampler, repetitions, qubits,
-                                                  circuits_k)
-
-        # Simulate each circuit with the Cirq simulator to obtain the
-        # wavefunction at the end of each circuit, from which the
+        bitstrings = _sample_bitstrings(sampler, repetitions, qubits,
+                                        circuits_k)
+        if keep_bitstrings:
+            measured[:, k] = bitstrings
+        else:
+            _measure_prob_distribution(bitstrings, measured[:, k])
+
+        # Simulate the longest circuit with the Cirq simulator and record the
+        # wavefunction at the end of each shorter circuit, from which the
         # theoretically expected bit-string probabilities are obtained.
-        probs_exp_k = []  # type: List[np.ndarray]
-        for circ_k in circuits_k:
-            res = simulator.simulate(circ_k, qubit_order=qubits)
-            state_probs = np.abs(np.asarray(res.final_state)  # type: ignore
-                                )**2
-            probs_exp_k.append(state_probs)
-
-        for i, num_cycle in enumerate(cycle_range):
-            probs_exp[num_cycle][k, :] = probs_exp_k[i]
-            probs_meas[num_cycle][k, :] = probs_meas_k[i]
-
-    fidelity_vals = _xeb_fidelities(probs_exp, probs_meas)
+        _simulate_prob_distributions(simulator, qubits, circuits_k,
+                                     probs_exp[:, k])
+
+    # The random generator isn't thread safe, so each trial gets its own,
+    # derived from rng. Deriving them the same way when running sequentially
+    # keeps the circuits independent of num_threads.
+    trial_rngs = [
+        np.random.default_rng(seed)
+        for seed in rng.integers(2**63, size=num_circuits)
+    ]
+    if num_threads > 1:
+        # Each trial writes to its own rows of the probability arrays.
+        with dummy.Pool(num_threads) as pool:
+            pool.starmap(run_trial, zip(range(num_circuits), trial_rngs))
+    else:
+        for k in range(num_circuits):
+            run_trial(k, trial_rngs[k])
+
+    if keep_bitstrings:
+        pp_cross = _sampled_cross_sums(probs_exp, measured)
+    else:
+        pp_cross = np.einsum('cmi,cmi->c',
+                             probs_exp,
+                             measured,
+                             dtype=np.float64)
+    fidelity_vals = _xeb_fidelities(probs_exp, pp_cross)
     xeb_data = [
         CrossEntropyPair(c, k) for (c, k) in zip(cycle_range, fidelity_vals)
     ]
@@ -259,114 +322,269 @@ def _build_xeb_circuits(
         cycles: Sequence[int],
         single_qubit_gates: List[List[ops.SingleQubitGate]] = None,
         benchmark_ops: Sequence[ops.Moment] = None,
+        rng: Optional[np.random.Generator] = None,
 ) -> List[circuits.Circuit]:
-    if benchmark_ops is not None:
-        num_d = len(benchmark_ops)
-    else:
-        num_d = 0
+    rng = np.random.default_rng() if rng is None else rng
     max_cycles = max(cycles)
 
     if single_qubit_gates is None:
-        single_rots = _random_half_rotations(qubits, max_cycles)
+        single_rots = _random_half_rotations(qubits, max_cycles, rng)
     else:
-        single_rots = _random_any_gates(qubits, single_qubit_gates, max_cycles)
-    all_circuits = []  # type: List[circuits.Circuit]
-    for num_cycles in cycles:
-        circuit_exp = circuits.Circuit()
-        for i in range(num_cycles):
-            circuit_exp.append(single_rots[i])
-            if benchmark_ops is not None:
-                for op_set in benchmark_ops[i % num_d]:
-                    circuit_exp.append(op_set)
-        all_circuits.append(circuit_exp)
-    return all_circuits
-
-
-def _measure_prob_distribution(sampler: work.Sampler, repetitions: int,
-                               qubits: Sequence[ops.Qid],
-                               circuit_list: List[circuits.Circuit]
-                              ) -> List[np.ndarray]:
-    all_probs = []  # type: List[np.ndarray]
-    num_states = 2**len(qubits)
-    for circuit in circuit_list:
-        trial_circuit = circuit.copy()
-        trial_circuit.append(ops.measure(*qubits, key='z'))
-        res = sampler.run(trial_circuit, repetitions=repetitions)
-        res_hist = dict(res.histogram(key='z'))
-        probs = np.zeros(num_states, dtype=float)
-        for k, v in res_hist.items():
-            probs[k] = float(v) / float(repetitions)
-        all_probs.append(probs)
-    return all_probs
-
-
-def _xeb_fidelities(ideal_probs: Dict[int, np.ndarray],
-                    actual_probs: Dict[int, np.ndarray]) -> List[float]:
-    num_cycles = sorted(list(ideal_probs.keys()))
-    return [
-        _compute_fidelity(ideal_probs[n], actual_probs[n]) for n in num_cycles
+        single_rots = _random_any_gates(qubits, single_qubit_gates, max_cycles,
+                                        rng)
+
+    # Every cycle starts in a new moment and benchmark moments are appended
+    # as they are, so that a circuit with fewer cycles is a moment prefix of
+    # the circuit with max_cycles cycles. When each qubit gets exactly one
+    # gate per layer, every layer is a single moment.
+    if single_qubit_gates is None or all(
+            len(gates) == 1 for gates in single_qubit_gates):
+        cycle_moments = [[ops.Moment(layer)] for layer in single_rots]
+    else:
+        cycle_moments = [
+            list(circuits.Circuit.from_ops(layer)) for layer in single_rots
+        ]
+    if benchmark_ops is not None:
+        schedule = np.arange(max_cycles) % len(benchmark_ops)
+        for moments, d in zip(cycle_moments, schedule.tolist()):
+            moments.append(benchmark_ops[d])
+
+    # cycle_ends[n] is the number of moments in the first n cycles.
+    cycle_ends = np.cumsum([0] + [len(m) for m in cycle_moments]).tolist()
+    full_circuit = circuits.Circuit(
+        itertools.chain.from_iterable(cycle_moments))
+    return [full_circuit[:cycle_ends[n]] for n in cycles]
+
+
+def _simulate_prob_distributions(simulator: sim.Simulator,
+                                 qubits: Sequence[ops.Qid],
+                                 circuit_list: List[circuits.Circuit],
+                                 out: Sequence[np.ndarray]) -> None:
+    # All circuits are moment prefixes of the longest one, so only the
+    # longest circuit is simulated and the state is recorded after the last
+    # moment of every shorter circuit. The probabilities of the i-th circuit
+    # are written directly into out[i].
+    rows_at = {}  # type: Dict[int, List[np.ndarray]]
+    for circuit, row in zip(circuit_list, out):
+        rows_at.setdefault(len(circuit), []).append(row)
+    for row in rows_at.pop(0, []):
+        row[:] = 0.0
+        row[0] = 1.0
+    if not rows_at:
+        return
+    longest = circuit_list[int(np.argmax([len(c) for c in circuit_list]))]
+
+    components = _connected_qubit_components(qubits, longest)
+    if len(components) == 1 and len(components[0]) > 1:
+        for i, state in _prefix_states(simulator, qubits, longest, rows_at):
+            first, *rest = rows_at[i]
+            np.abs(state, out=first)
+            np.square(first, out=first)
+            for row in rest:
+                row[:] = first
+        return
+
+    # The state is a product of the states of the components, so each
+    # component is simulated on its own and the probabilities are combined
+    # with outer products. The axes of the outer product follow the order of
+    # the qubits in components and are transposed back to the order of qubits.
+    # Single qubits are evolved directly with their 2x2 unitaries, which
+    # covers circuits without benchmark_ops entirely.
+    component_probs = []  # type: List[Dict[int, np.ndarray]]
+    for component in components:
+        component_circuit = circuits.Circuit(
+            ops.Moment(op for op in moment if op.qubits[0] in component)
+            for moment in longest)
+        states = None  # type: Optional[Iterator[Tuple[int, np.ndarray]]]
+        if len(component) == 1:
+            states = _single_qubit_prefix_states(component_circuit, rows_at)
+        if states is None:
+            states = _prefix_states(simulator, component, component_circuit,
+                                    rows_at)
+        component_probs.append({i: np.abs(state)**2 for i, state in states})
+    qubit_index = {q: j for j, q in enumerate(qubits)}
+    axes = np.argsort([qubit_index[q] for c in components for q in c])
+    for i, rows in rows_at.items():
+        probs = functools.reduce(np.multiply.outer,
+                                 [p[i] for p in component_probs])
+        probs = probs.reshape((2,) * len(qubits)).transpose(axes)
+        for row in rows:
+            row[:] = probs.reshape(-1)
+
+
+def _prefix_states(simulator: sim.Simulator, qubits: Sequence[ops.Qid],
+                   circuit: circuits.Circuit, moment_counts: Container[int]
+                  ) -> Iterator[Tuple[int, np.ndarray]]:
+    # Yields the wavefunction after the first i moments of the circuit for
+    # every i in moment_counts.
+    moment_steps = simulator.simulate_moment_steps(circuit, qubit_order=qubits)
+    for i, step in zip(range(1, len(circuit) + 1), moment_steps):
+        if i in moment_counts:
+            yield i, step.state_vector()
+
+
+def _single_qubit_prefix_states(circuit: circuits.Circuit,
+                                moment_counts: Container[int]
+                               ) -> Optional[Iterator[Tuple[int, np.ndarray]]]:
+    # Same as _prefix_states for a circuit on a single qubit, but multiplies
+    # the 2x2 unitaries of the operations instead of using a simulator. The
+    # circuits repeat a few operations many times, so the unitaries are
+    # looked up once per distinct operation. Returns None if an operation
+    # doesn't have a unitary.
+    unitaries = {
+        op: protocols.unitary(op, None)
+        for op in set(circuit.all_operations())
+    }
+    if any(u is None for u in unitaries.values()):
+        return None
+
+    def states() -> Iterator[Tuple[int, np.ndarray]]:
+        state = np.array([1, 0], dtype=np.complex128)
+        for i, moment in enumerate(circuit, 1):
+            for op in moment:
+                state = unitaries[op].dot(state)
+            if i in moment_counts:
+                yield i, state
+
+    return states()
+
+
+def _connected_qubit_components(qubits: Sequence[ops.Qid],
+                                circuit: circuits.Circuit
+                               ) -> List[List[ops.Qid]]:
+    # Groups the qubits into sets that are never entangled with each other
+    # by the circuit. Each group keeps the order of qubits.
+    graph = networkx.Graph()
+    graph.add_nodes_from(qubits)
+    for op in circuit.all_operations():
+        graph.add_edges_from(zip(op.qubits, op.qubits[1:]))
+    qubit_index = {q: j for j, q in enumerate(qubits)}
+    components = [
+        sorted(c, key=qubit_index.__getitem__)
+        for c in networkx.connected_components(graph)
     ]
-
-
-def _compute_fidelity(probs_exp: np.ndarray, probs_meas: np.ndarray) -> float:
-    _, num_states = probs_exp.shape
-    pp_cross = probs_exp * probs_meas
-    pp_exp = probs_exp**2
-    f_meas = np.mean(num_states * np.sum(pp_cross, axis=1) - 1.0)
-    f_exp = np.mean(num_states * np.sum(pp_exp, axis=1) - 1.0)
-    return float(f_meas / f_exp)
+    return sorted(components, key=lambda c: qubit_index[c[0]])
+
+
+def _sample_bitstrings(sampler: work.Sampler, repetitions: int,
+                       qubits: Sequence[ops.Qid],
+                       circuit_list: List[circuits.Circuit]
+                      ) -> List[np.ndarray]:
+    # Returns, for each circuit, the indices of the measured bit-strings.
+    # Big-endian weights turn a row of measured bits into the index of the
+    # corresponding bit-string.
+    powers = 1 << np.arange(len(qubits) - 1, -1, -1, dtype=np.int64)
+    # Moments are immutable, so the measured circuits share the moments of
+    # the given circuits and a single measurement moment.
+    measure_moment = ops.Moment([ops.measure(*qubits, key='z')])
+    trial_circuits = [
+        circuits.Circuit(itertools.chain(circuit, [measure_moment]),
+                         circuit.device) for circuit in circuit_list
+    ]
+    results = sampler.run_batch(trial_circuits, repetitions=repetitions)
+    return [res.measurements['z'].dot(powers) for (res,) in results]
+
+
+def _measure_prob_distribution(bitstrings: List[np.ndarray],
+                               out: Sequence[np.ndarray]) -> None:
+    # The probabilities estimated from bitstrings[i] are written directly
+    # into out[i].
+    num_states = len(out[0])
+    inv_repetitions = 1.0 / len(bitstrings[0])
+    for indices, row in zip(bitstrings, out):
+        counts = np.bincount(indices, minlength=num_states)
+        np.multiply(counts, inv_repetitions, out=row)
+
+
+def _sampled_cross_sums(probs_exp: np.ndarray,
+                        bitstrings: np.ndarray) -> np.ndarray:
+    # Same as summing probs_exp * probs_meas over the circuits and
+    # bit-strings, where probs_meas are the probabilities estimated from
+    # bitstrings, but only touches the sampled bit-strings.
+    _, _, repetitions = bitstrings.shape
+    sampled_probs = np.take_along_axis(probs_exp, bitstrings, axis=2)
+    return sampled_probs.sum(axis=(1, 2), dtype=np.float64) / repetitions
+
+
+def _xeb_fidelities(probs_exp: np.ndarray,
+                    pp_cross: np.ndarray) -> List[float]:
+    # probs_exp has the shape (num_cycles, num_circuits, num_states) and
+    # pp_cross[c] is the sum over circuits of the per-circuit sums of the
+    # simulated times the measured probabilities. The averages over circuits
+    # of the per-circuit sums of the squared simulated probabilities are
+    # computed in a single multiply-and-reduce pass, accumulated in double
+    # precision.
+    _, num_circuits, num_states = probs_exp.shape
+    pp_exp = np.einsum('cmi,cmi->c', probs_exp, probs_exp, dtype=np.float64)
+    f_meas = num_states * pp_cross / num_circuits - 1.0
+    f_exp = num_states * pp_exp / num_circuits - 1.0
+    return (f_meas / f_exp).tolist()
 
 
 def _random_half_rotations(qubits: Sequence[ops.Qid],
-                           num_layers: int) -> List[List[ops.OP_TREE]]:
+                           num_layers: int,
+                           rng: np.random.Generator
+                          ) -> List[List[ops.OP_TREE]]:
     rot_ops = [
         ops.X**0.5, ops.Y**0.5,
         ops.PhasedXPowGate(phase_exponent=0.25, exponent=0.5)
     ]
     num_qubits = len(qubits)
-    rand_nums = np.random.choice(3, (num_qubits, num_layers))
-    single_q_layers = []  # type: List[List[ops.OP_TREE]]
-    for i in range(num_layers):
-        single_q_layers.append(
-            [rot_ops[rand_nums[j, i]](qubits[j]) for j in range(num_qubits)])
-    return single_q_layers
+    rand_nums = rng.integers(3, size=(num_qubits, num_layers))
+    # ops_table[r, j] is rotation r applied to qubit j. Indexing it with the
+    # random numbers gives a (num_qubits, num_layers) array of operations.
+    ops_table = np.empty((len(rot_ops), num_qubits), dtype=object)
+    for r, rot in enumerate(rot_ops):
+        for j, qubit in enumerate(qubits):
+            ops_table[r, j] = rot(qubit)
+    layers = ops_table[rand_nums, np.arange(num_qubits)[:, None]]
+    return layers.T.tolist()
 
 
 def _random_any_gates(qubits: Sequence[ops.Qid],
                       op_list: List[List[ops.SingleQubitGate]],
-                      num_layers: int) -> List[List[ops.OP_TREE]]:
+                      num_layers: int,
+                      rng: np.random.Generator
+                     ) -> List[List[ops.OP_TREE]]:
     num_ops = len(op_list)
     num_qubits = len(qubits)
-    rand_nums = np.random.choice(num_ops, (num_qubits, num_layers))
-    single_q_layers = []  # type: List[List[ops.OP_TREE]]
-    for i in range(num_layers):
-        rots_i = []  # type: List[ops.OP_TREE]
-        for j in range(num_qubits):
-            rots_i.extend([rot(qubits[j]) for rot in op_list[rand_nums[j, i]]])
-        single_q_layers.append(rots_i)
-    return single_q_layers
+    rand_nums = rng.integers(num_ops, size=(num_qubits, num_layers))
+    # ops_table[r, j] is the list of operations of choice r on qubit j.
+    ops_table = np.empty((num_ops, num_qubits), dtype=object)
+    for r, rots in enumerate(op_list):
+        for j, qubit in enumerate(qubits):
+            ops_table[r, j] = [rot(qubit) for rot in rots]
+    layers = ops_table[rand_nums, np.arange(num_qubits)[:, None]]
+    return [
+        list(itertools.chain.from_iterable(layers[:, i]))
+        for i in range(num_layers)
+    ]
 
 
 def _default_interaction_sequence(
         qubits: Sequence[devices.GridQubit]
 ) -> List[Set[Tuple[devices.GridQubit, devices.GridQubit]]]:
     qubit_dict = {(qubit.row, qubit.col): qubit for qubit in qubits}
-    qubit_locs = set(qubit_dict)
-    num_rows = max([q.row for q in qubits]) + 1
-    num_cols = max([q.col for q in qubits]) + 1
+    rows = np.fromiter((q.row for q in qubits), dtype=int, count=len(qubits))
+    cols = np.fromiter((q.col for q in qubits), dtype=int, count=len(qubits))
+    min_row, min_col = rows.min(), cols.min()
+
+    # Boolean map of the occupied grid sites. The neighboring pairs are found
+    # by overlapping the map with itself shifted by one column or one row.
+    occupied = np.zeros((rows.max() - min_row + 1, cols.max() - min_col + 1),
+                        dtype=bool)
+    occupied[rows - min_row, cols - min_col] = True
+    offset = np.array([min_row, min_col])
+    horizontal = np.argwhere(occupied[:, :-1] & occupied[:, 1:]) + offset
+    vertical = np.argwhere(occupied[:-1, :] & occupied[1:, :]) + offset
 
     l_s = [set() for _ in range(4)
           ]  # type: List[Set[Tuple[devices.GridQubit, devices.GridQubit]]]
-    for i in range(num_rows):
-        for j in range(num_cols - 1):
-            if (i, j) in qubit_locs and (i, j + 1) in qubit_locs:
-                l_s[j % 2 * 2].add((qubit_dict[(i, j)], qubit_dict[(i, j + 1)]))
-
-    for i in range(num_rows - 1):
-        for j in range(num_cols):
-            if (i, j) in qubit_locs and (i + 1, j) in qubit_locs:
-                l_s[i % 2 * 2 + 1].add(
-                    (qubit_dict[(i, j)], qubit_dict[(i + 1, j)]))
+    for i, j in horizontal.tolist():
+        l_s[j % 2 * 2].add((qubit_dict[(i, j)], qubit_dict[(i, j + 1)]))
+
+    for i, j in vertical.tolist():
+        l_s[i % 2 * 2 + 1].add((qubit_dict[(i, j)], qubit_dict[(i + 1, j)]))
 
     l_final = []  # type: List[Set[Tuple[devices.GridQubit, devices.GridQubit]]]
     for gate_set in l_s:
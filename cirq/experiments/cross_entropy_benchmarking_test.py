@@ -2,6 +2,10 @@ import numpy as np
 
 from cirq import ops, sim, devices
 from cirq.experiments import cross_entropy_benchmarking, build_entangling_layers
+from cirq.experiments.cross_entropy_benchmarking import (
+    CrossEntropyPair, CrossEntropyResult, _build_xeb_circuits,
+    _measure_prob_distribution, _sampled_cross_sums,
+    _simulate_prob_distributions)
 
 
 def test_cross_entropy_benchmarking():
@@ -69,3 +73,157 @@ def test_cross_entropy_benchmarking():
 
     # Sanity test that plot runs.
     results_1.plot()
+
+
+def test_cross_entropy_benchmarking_num_threads():
+    # Running the trials on a thread pool still gives fidelities close to 1.
+    simulator = sim.Simulator()
+    qubits = [
+        devices.GridQubit(0, 0),
+        devices.GridQubit(0, 1),
+        devices.GridQubit(1, 0),
+        devices.GridQubit(1, 1)
+    ]
+    interleaved_ops = build_entangling_layers(qubits, ops.CZ**0.91)
+    single_qubit_rots = [[ops.X**0.37], [ops.Y**0.73, ops.X**0.53],
+                         [ops.Z**0.61, ops.X**0.43], [ops.Y**0.19]]
+    results = cross_entropy_benchmarking(
+        simulator,
+        qubits,
+        benchmark_ops=interleaved_ops,
+        num_circuits=5,
+        repetitions=5000,
+        cycles=range(4, 30, 5),
+        scrambling_gates_per_cycle=single_qubit_rots,
+        num_threads=2)
+    fidelities = [datum.xeb_fidelity for datum in results.data]
+    assert np.isclose(np.mean(fidelities), 1.0, atol=0.1)
+
+
+def test_simulate_prob_distributions_matches_full_simulation():
+    simulator = sim.Simulator()
+    qubits = [devices.GridQubit(0, 0), devices.GridQubit(0, 1)]
+    benchmark_ops = build_entangling_layers(qubits, ops.CZ**0.91)
+    single_qubit_rots = [[ops.X**0.37], [ops.Y**0.73, ops.X**0.53]]
+    circuits = _build_xeb_circuits(qubits, [5, 0, 1, 3], single_qubit_rots,
+                                   benchmark_ops)
+    probs = np.zeros((len(circuits), 4))
+    _simulate_prob_distributions(simulator, qubits, circuits, probs)
+    for circuit, state_probs in zip(circuits, probs):
+        result = simulator.simulate(circuit, qubit_order=qubits)
+        np.testing.assert_allclose(state_probs,
+                                   np.abs(result.final_state)**2,
+                                   atol=1e-6)
+
+
+def test_build_xeb_circuits_seeded_rng_is_reproducible():
+    qubits = [devices.GridQubit(0, 0), devices.GridQubit(0, 1)]
+    circuits_a = _build_xeb_circuits(qubits, [3, 7],
+                                     rng=np.random.default_rng(1234))
+    circuits_b = _build_xeb_circuits(qubits, [3, 7],
+                                     rng=np.random.default_rng(1234))
+    assert circuits_a == circuits_b
+
+
+def test_cross_entropy_benchmarking_seeded_rng_is_reproducible():
+
+    class RecordingSimulator(sim.Simulator):
+
+        def __init__(self):
+            super().__init__()
+            self.circuits = []
+
+        def run_batch(self, programs, *args, **kwargs):
+            self.circuits.extend(programs)
+            return super().run_batch(programs, *args, **kwargs)
+
+    qubits = [devices.GridQubit(0, 0), devices.GridQubit(0, 1)]
+
+    def sampled_circuits(num_threads, rng=None):
+        sampler = RecordingSimulator()
+        cross_entropy_benchmarking(sampler,
+                                   qubits,
+                                   num_circuits=4,
+                                   repetitions=10,
+                                   cycles=[2, 5],
+                                   num_threads=num_threads,
+                                   rng=rng)
+        return sorted(sampler.circuits, key=str)
+
+    circuits = sampled_circuits(1, np.random.default_rng(1234))
+    assert sampled_circuits(1, np.random.default_rng(1234)) == circuits
+    assert sampled_circuits(3, np.random.default_rng(1234)) == circuits
+    assert sampled_circuits(1, np.random.default_rng(4321)) != circuits
+    np.random.seed(0)
+    circuits = sampled_circuits(1)
+    np.random.seed(0)
+    assert sampled_circuits(2) == circuits
+
+
+def test_simulate_prob_distributions_disconnected_qubits():
+    simulator = sim.Simulator()
+    q0, q1, q2, q3 = [devices.GridQubit(0, j) for j in range(4)]
+    # The pairs (q0, q1) and (q2, q3) are never entangled with each other and
+    # are interleaved in the qubit order.
+    qubits = [q0, q2, q3, q1]
+    benchmark_ops = [ops.Moment([ops.CZ(q0, q1)**0.7, ops.CZ(q2, q3)**0.3])]
+    circuits = _build_xeb_circuits(qubits, [4, 2], None, benchmark_ops)
+    probs = np.zeros((len(circuits), 16))
+    _simulate_prob_distributions(simulator, qubits, circuits, probs)
+    for circuit, state_probs in zip(circuits, probs):
+        result = simulator.simulate(circuit, qubit_order=qubits)
+        np.testing.assert_allclose(state_probs,
+                                   np.abs(result.final_state)**2,
+                                   atol=1e-6)
+
+
+def test_cross_entropy_result_columns():
+    result = CrossEntropyResult(
+        [CrossEntropyPair(2, 0.9),
+         CrossEntropyPair(5, 0.7),
+         CrossEntropyPair(9, 0.4)])
+    np.testing.assert_array_equal(result.num_cycles, [2, 5, 9])
+    np.testing.assert_allclose(result.fidelities, [0.9, 0.7, 0.4])
+    assert result.data == [(2, 0.9), (5, 0.7), (9, 0.4)]
+    assert all(isinstance(d, CrossEntropyPair) for d in result.data)
+
+
+def test_simulate_prob_distributions_without_benchmark_ops():
+    simulator = sim.Simulator()
+    qubits = [devices.GridQubit(0, j) for j in range(3)]
+    single_qubit_rots = [[ops.X**0.37], [ops.Y**0.73, ops.X**0.53]]
+    circuits = _build_xeb_circuits(qubits, [6, 1, 3], single_qubit_rots)
+    probs = np.zeros((len(circuits), 8))
+    _simulate_prob_distributions(simulator, qubits, circuits, probs)
+    for circuit, state_probs in zip(circuits, probs):
+        result = simulator.simulate(circuit, qubit_order=qubits)
+        np.testing.assert_allclose(state_probs,
+                                   np.abs(result.final_state)**2,
+                                   atol=1e-6)
+
+
+def test_sampled_cross_sums_match_measured_probabilities():
+    rng = np.random.default_rng(1)
+    probs_exp = rng.random((3, 5, 64)).astype(np.float32)
+    bitstrings = rng.integers(64, size=(3, 5, 10))
+    probs_meas = np.zeros_like(probs_exp)
+    for c in range(3):
+        _measure_prob_distribution(list(bitstrings[c]), probs_meas[c])
+    np.testing.assert_allclose(
+        _sampled_cross_sums(probs_exp, bitstrings),
+        np.einsum('cmi,cmi->c', probs_exp, probs_meas, dtype=np.float64),
+        rtol=1e-6)
+
+
+def test_cross_entropy_benchmarking_few_repetitions():
+    # With fewer repetitions than a quarter of the bit-strings, the sampled
+    # bit-strings are kept instead of the measured probabilities.
+    qubits = [devices.GridQubit(0, j) for j in range(6)]
+    result = cross_entropy_benchmarking(sim.Simulator(),
+                                        qubits,
+                                        benchmark_ops=build_entangling_layers(
+                                            qubits, ops.CZ),
+                                        num_circuits=20,
+                                        repetitions=15,
+                                        cycles=[3, 6])
+    assert np.isclose(np.mean(result.fidelities), 1.0, atol=0.3)
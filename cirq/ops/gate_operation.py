@@ -101,6 +101,9 @@ class GateOperation(raw_types.Operation):
                                                     self.qubits,
                                                     NotImplemented)
 
+    def _is_terminal_(self) -> bool:
+        return getattr(self.gate, '_decompose_', None) is None
+
     def _pauli_expansion_(self) -> value.LinearDict[str]:
         return protocols.pauli_expansion(self.gate)
 
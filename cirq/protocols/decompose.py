@@ -13,7 +13,9 @@
 # limitations under the License.
 
 from typing import TYPE_CHECKING, Callable, Union, Any, Tuple, Iterable, \
-    TypeVar, List, Optional, overload
+    TypeVar, List, Optional, overload, Hashable, Dict
+import functools
+from concurrent import futures
 
 from typing_extensions import Protocol
 
@@ -76,6 +78,13 @@ class SupportsDecompose(Protocol):
     2-qubit operations. When this happens, `cirq.decompose` will raise
     a `TypeError` by default, but can be configured to ignore the issue or
     raise a caller-provided error.
+
+    Values that are known to have no decomposition may optionally define an
+    `_is_terminal_(self) -> bool` method. If it is present and returns True,
+    `cirq.decompose_once` treats the value as undecomposable without calling
+    its `_decompose_` method. Gate operations implement it, returning True
+    when their gate has no `_decompose_` method, so that `cirq.decompose`
+    doesn't make a futile call for every leaf.
     """
 
     def _decompose_(self) -> Union[None, 'cirq.OP_TREE', NotImplementedType]:
@@ -106,9 +115,75 @@ class SupportsDecomposeWithQubits(Protocol):
         pass
 
 
-def _default_decomposer(op: 'cirq.Operation'
-                        ) -> Union[None, 'cirq.OP_TREE', NotImplementedType]:
-    return decompose_once(op, default=NotImplemented)
+def _memoized_default_decomposer(memo: Dict[Hashable, Any]
+                                ) -> Callable[[Any], Any]:
+    """Returns a default decomposer that remembers results in `memo`.
+
+    Decompositions of plain `cirq.GateOperation`s (subclasses may override
+    `_decompose_`) are remembered, so that operations repeated within a single
+    `cirq.decompose` call are decomposed once. The key is the gate's type, its
+    complete instance state and the qubits in order. Value equality isn't
+    enough, because equality values may be canonicalized (`CNOT**2.5` equals
+    `CNOT**0.5`) while `_decompose_` reads the raw state, and decompositions
+    may depend on the qubits (e.g. on qubit adjacency). Gates without a
+    `__dict__` or with unhashable state aren't memoized.
+
+    The returned decomposer gives either a flat list of operations or
+    NotImplemented.
+    """
+    from cirq import ops  # HACK: Avoids circular dependencies.
+
+    gate_operation_type = ops.GateOperation
+
+    def decomposer(op):
+        is_terminal = getattr(op, '_is_terminal_', None)
+        if is_terminal is not None and is_terminal():
+            return NotImplemented
+        state = (getattr(op.gate, '__dict__', None)
+                 if type(op) is gate_operation_type else None)
+        if state is None:
+            return decompose_once(op, default=NotImplemented)
+
+        key = (type(op.gate), tuple(state.items()), op.qubits)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable gate state.
+            return decompose_once(op, default=NotImplemented)
+        decomposed = memo[key] = decompose_once(op, default=NotImplemented)
+        return decomposed
+
+    return decomposer
+
+
+def _decompose_fully(val: Any) -> List['cirq.Operation']:
+    """Decomposes a value until nothing can be decomposed further.
+
+    This is `cirq.decompose` without a `keep` predicate or custom decomposers,
+    which is by far its most common use. Without `keep` nothing can get stuck,
+    so the traversal reduces to a plain depth-first walk.
+    """
+    from cirq import ops  # HACK: Avoids circular dependencies.
+
+    operation_type = ops.Operation
+    flatten_op_tree = ops.flatten_op_tree
+
+    decomposer = _memoized_default_decomposer({})
+
+    output = []
+    stack: List[Any] = [val]
+    while stack:
+        item = stack.pop()
+        decomposed = decomposer(item)
+        if decomposed is not NotImplemented:
+            stack.extend(reversed(decomposed))
+        elif (not isinstance(item, operation_type) and
+              isinstance(item, Iterable)):
+            stack.extend(reversed(tuple(flatten_op_tree(item))))
+        else:
+            output.append(item)
+    return output
 
 
 # pylint: disable=function-redefined
@@ -124,7 +199,8 @@ def decompose(
                                   Union[None,
                                         NotImplementedType,
                                         'cirq.OP_TREE']] = None,
-    keep: Callable[['cirq.Operation'], bool] = None
+    keep: Callable[['cirq.Operation'], bool] = None,
+    max_workers: int = 1
 ) -> List['cirq.Operation']:
     pass
 
@@ -145,7 +221,8 @@ def decompose(
     on_stuck_raise: Optional[Union[
         TError,
         Callable[['cirq.Operation'], TError]]
-    ]
+    ],
+    max_workers: int = 1
 ) -> List['cirq.Operation']:
     pass
 
@@ -166,7 +243,8 @@ def decompose(
                           Exception,
                           Callable[['cirq.Operation'],
                                    Union[None, Exception]]]
-    = _value_error_describing_bad_operation
+    = _value_error_describing_bad_operation,
+    max_workers: int = 1
 ) -> List['cirq.Operation']:
     """Recursively decomposes a value into `cirq.Operation`s meeting a criteria.
 
@@ -195,6 +273,16 @@ def decompose(
             returns `None`, undecomposable operations are simply silently kept.
             `on_stuck_raise` defaults to a `ValueError` describing the unwanted
             undecomposable operation.
+        max_workers: The number of threads used to decompose the operations
+            that `val` decomposes into, when an `intercepting_decomposer` or
+            `fallback_decomposer` is given. Defaults to 1, meaning that
+            everything is decomposed on the calling thread. Larger values only
+            help when the custom decomposers spend their time in code that
+            releases the GIL (e.g. numpy-heavy matrix decompositions), and
+            require the decomposers, `keep` and `on_stuck_raise` to be thread
+            safe. Without custom decomposers, decomposition is pure Python and
+            always runs on the calling thread. The output order doesn't
+            depend on `max_workers`.
 
     Returns:
         A list of operations that the given value was decomposed into. If
@@ -223,38 +311,103 @@ def decompose(
             "not possible to get stuck if you don't have a criteria on what's "
             "acceptable to keep.")
 
-    decomposers = [d
-                   for d in [intercepting_decomposer,
-                             _default_decomposer,
-                             fallback_decomposer]
-                   if d]
+    has_custom_decomposer = (intercepting_decomposer is not None or
+                             fallback_decomposer is not None)
+    if not has_custom_decomposer and keep is None:
+        return _decompose_fully(val)
 
-    def decomposer(op):
-        for d in decomposers:
-            r = d(op)
-            if r is not NotImplemented and r is not None:
-                return r
-        return NotImplemented
+    # Bound to locals because they are looked up for every visited item.
+    operation_type = ops.Operation
+    flatten_op_tree = ops.flatten_op_tree
 
+    def flattened(d):
+        # Wraps a caller-supplied decomposer so that it returns either a flat
+        # tuple of operations or NotImplemented, like the default decomposer.
+        def flattened_decomposer(op):
+            r = d(op)
+            if r is NotImplemented or r is None:
+                return NotImplemented
+            return tuple(flatten_op_tree(r))
+
+        return flattened_decomposer
+
+    def chained(first, second):
+        def chained_decomposer(op):
+            r = first(op)
+            return second(op) if r is NotImplemented else r
+
+        return chained_decomposer
+
+    # Specialize the decomposer to the given arguments once, instead of
+    # looping over the candidate decomposers for every visited item. Without
+    # intercepting and fallback decomposers, it is the default decomposer.
+    decomposers = [_memoized_default_decomposer({})]
+    if intercepting_decomposer:
+        decomposers.insert(0, flattened(intercepting_decomposer))
+    if fallback_decomposer:
+        decomposers.append(flattened(fallback_decomposer))
+    decomposer = functools.reduce(chained, decomposers)
+
+    if max_workers > 1 and has_custom_decomposer:
+        # Expand `val` once, then decompose contiguous chunks of the result
+        # on separate threads. Subtrees are independent, so concatenating the
+        # chunks' outputs in order matches the sequential result.
+        is_operation = isinstance(val, operation_type)
+        if is_operation and keep is not None and keep(val):
+            return [val]
+        roots = decomposer(val)
+        if (roots is NotImplemented and not is_operation and
+                isinstance(val, Iterable)):
+            roots = tuple(flatten_op_tree(val))
+        if roots is not NotImplemented:
+            chunk_size = max(1, -(-len(roots) // max_workers))
+            chunks = [
+                roots[i:i + chunk_size]
+                for i in range(0, len(roots), chunk_size)
+            ]
+
+            def decompose_chunk(chunk):
+                return [
+                    op for item in chunk for op in decompose(
+                        item,
+                        intercepting_decomposer=intercepting_decomposer,
+                        fallback_decomposer=fallback_decomposer,
+                        keep=keep,
+                        on_stuck_raise=on_stuck_raise)
+                ]
+
+            with futures.ThreadPoolExecutor(max_workers) as executor:
+                return [
+                    op for chunk_output in executor.map(decompose_chunk, chunks)
+                    for op in chunk_output
+                ]
+
+    # Loop invariant. (`keep is not None` stays inline below because that is
+    # what lets mypy know that `keep` can be called.)
+    raise_when_stuck = keep is not None and on_stuck_raise is not None
+
+    # Depth-first traversal. Children are pushed in reverse so that they are
+    # popped, and therefore output, in their original order.
     output = []
-    queue: List[Any] = [val]
-    while queue:
-        item = queue.pop(0)
+    stack: List[Any] = [val]
+    while stack:
+        item = stack.pop()
+        is_operation = isinstance(item, operation_type)
 
-        if isinstance(item, ops.Operation) and keep is not None and keep(item):
+        if is_operation and keep is not None and keep(item):
             output.append(item)
             continue
 
         decomposed = decomposer(item)
-        if decomposed is not NotImplemented and decomposed is not None:
-            queue[:0] = ops.flatten_op_tree(decomposed)
+        if decomposed is not NotImplemented:
+            stack.extend(reversed(decomposed))
             continue
 
-        if (not isinstance(item, ops.Operation) and isinstance(item, Iterable)):
-            queue[:0] = ops.flatten_op_tree(item)
+        if not is_operation and isinstance(item, Iterable):
+            stack.extend(reversed(tuple(flatten_op_tree(item))))
             continue
 
-        if keep is not None and on_stuck_raise is not None:
+        if raise_when_stuck:
             if isinstance(on_stuck_raise, Exception):
                 raise on_stuck_raise
             elif callable(on_stuck_raise):
@@ -308,6 +461,13 @@ def decompose_once(val: Any,
         `val` didn't have a `_decompose_` method (or that method returned
         `NotImplemented` or `None`) and `default` wasn't set.
     """
+    is_terminal = getattr(val, '_is_terminal_', None)
+    if is_terminal is not None and is_terminal():
+        if default is not RaiseTypeErrorIfNotProvided:
+            return default
+        raise TypeError("object of type '{}' is terminal and can't be "
+                        "decomposed.".format(type(val)))
+
     method = getattr(val, '_decompose_', None)
     decomposed = NotImplemented if method is None else method(**kwargs)
 
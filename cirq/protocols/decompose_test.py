@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import threading
+
 import pytest
 
 import cirq
@@ -52,6 +54,14 @@ class DecomposeGenerated:
         yield cirq.Y(cirq.LineQubit(1))
 
 
+class DecomposeTerminal:
+    def _is_terminal_(self):
+        return True
+
+    def _decompose_(self):
+        raise AssertionError('terminal values must not be decomposed')
+
+
 def test_decompose_once():
     # No default value results in descriptive error.
     with pytest.raises(TypeError, match='no _decompose_ method'):
@@ -78,6 +88,34 @@ def test_decompose_once():
         cirq.X(cirq.LineQubit(0)), cirq.Y(cirq.LineQubit(1))]
 
 
+def test_decompose_once_terminal():
+    with pytest.raises(TypeError, match='is terminal'):
+        _ = cirq.decompose_once(DecomposeTerminal())
+    assert cirq.decompose_once(DecomposeTerminal(), None) is None
+
+    q = cirq.NamedQubit('q')
+    for op in [cirq.X(q), cirq.Z(q)**0.5, cirq.measure(q)]:
+        assert cirq.decompose_once(op, None) is None
+        assert cirq.decompose(op) == [op]
+    assert cirq.decompose_once(cirq.H(q), None) is not None
+
+
+def test_decompose_terminal_gate_subclass_with_decompose():
+
+    class MyX(cirq.XPowGate):
+
+        def _decompose_(self, qubits):
+            q, = qubits
+            return [cirq.H(q), cirq.Z(q), cirq.H(q)]
+
+    q = cirq.NamedQubit('q')
+    expected = [cirq.H(q), cirq.Z(q), cirq.H(q)]
+    assert cirq.decompose_once(MyX()(q)) == expected
+    assert cirq.decompose(MyX()(q),
+                          keep=lambda op: type(op.gate) is not MyX) == expected
+    assert cirq.decompose(MyX()(q)) == cirq.decompose(expected)
+
+
 def test_decompose_once_with_qubits():
     qs = cirq.LineQubit.range(3)
 
@@ -225,3 +263,109 @@ def test_decompose_intercept():
         keep=lambda op: isinstance(op.gate, cirq.CNotPowGate),
         intercepting_decomposer=lambda _: NotImplemented)
     assert actual == [cirq.CNOT(a, b), cirq.CNOT(b, a), cirq.CNOT(a, b)]
+
+
+class CountingGate(cirq.TwoQubitGate):
+    calls = 0
+
+    def _decompose_(self, qubits):
+        CountingGate.calls += 1
+        a, b = qubits
+        return [cirq.CZ(a, b), cirq.X(b)]
+
+
+def test_decompose_memoizes_gate_operations():
+    a, b = cirq.LineQubit.range(2)
+    CountingGate.calls = 0
+
+    assert cirq.decompose([CountingGate()(a, b)] * 3) == [
+        cirq.CZ(a, b), cirq.X(b)
+    ] * 3
+    assert CountingGate.calls == 1
+
+    # Qubits are part of the key.
+    assert cirq.decompose(CountingGate()(b, a)) == [cirq.CZ(b, a), cirq.X(a)]
+    assert CountingGate.calls == 2
+
+    # Nothing is remembered across calls.
+    assert cirq.decompose(CountingGate()(a, b),
+                          keep=lambda op: False,
+                          on_stuck_raise=None) == [cirq.CZ(a, b), cirq.X(b)]
+    assert CountingGate.calls == 3
+
+    # Gates that are equal but decompose differently aren't conflated. The
+    # results are compared by repr since CZ**2.5 == CZ**0.5.
+    ops = [(cirq.CNOT**2.5)(a, b), (cirq.CNOT**0.5)(a, b)]
+    decomposed = cirq.decompose(ops)
+    assert [repr(op) for op in decomposed] == [
+        repr(op) for op in cirq.decompose(ops[0]) + cirq.decompose(ops[1])
+    ]
+    assert [op.gate.exponent for op in decomposed
+            if isinstance(op.gate, cirq.CZPowGate)] == [2.5, 0.5]
+
+    # Gates with unhashable state are decomposed every time.
+    gate = cirq.TwoQubitMatrixGate(cirq.unitary(cirq.SWAP))
+    assert cirq.decompose([gate(a, b)] * 2) == cirq.decompose(gate(a, b)) * 2
+
+
+def test_decompose_max_workers():
+    main_thread = threading.get_ident()
+    threads = set()
+
+    def intercept(op):
+        threads.add(threading.get_ident())
+        return NotImplemented
+
+    qubits = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit.from_ops(
+        (cirq.TOFFOLI(*qubits[i:i + 3]), cirq.H(qubits[i]),
+         cirq.SWAP(*qubits[i + 1:i + 3])) for i in range(2))
+    expected = cirq.decompose(circuit, intercepting_decomposer=intercept)
+    assert threads == {main_thread}
+    for max_workers in [2, 3, 100]:
+        threads.clear()
+        assert cirq.decompose(circuit,
+                              intercepting_decomposer=intercept,
+                              max_workers=max_workers) == expected
+        assert threads - {main_thread}
+
+    # A single operation is expanded once and its parts are decomposed by
+    # the workers.
+    op = cirq.TOFFOLI(*qubits[:3])
+    threads.clear()
+    assert cirq.decompose(op, fallback_decomposer=intercept,
+                          max_workers=2) == cirq.decompose(op)
+    assert threads - {main_thread}
+
+    # Arguments are forwarded to the workers.
+    a, b = qubits[:2]
+    ops = [cirq.SWAP(a, b), cirq.CNOT(a, b), cirq.SWAP(b, a)]
+    keep = lambda op: isinstance(op.gate, cirq.CNotPowGate)
+    assert cirq.decompose(ops,
+                          keep=keep,
+                          intercepting_decomposer=intercept,
+                          max_workers=2) == cirq.decompose(ops, keep=keep)
+    assert cirq.decompose(ops[1],
+                          keep=keep,
+                          intercepting_decomposer=intercept,
+                          max_workers=2) == [ops[1]]
+    with pytest.raises(ValueError, match="can't be decomposed"):
+        _ = cirq.decompose(ops,
+                           keep=lambda op: False,
+                           intercepting_decomposer=intercept,
+                           max_workers=2)
+    assert cirq.decompose([],
+                          intercepting_decomposer=intercept,
+                          max_workers=2) == []
+    no_method = NoMethod()
+    assert cirq.decompose(no_method,
+                          intercepting_decomposer=intercept,
+                          max_workers=2) == [no_method]
+
+    # Without custom decomposers, everything runs on the calling thread.
+    threads.clear()
+    assert cirq.decompose(circuit,
+                          keep=lambda op: intercept(op) is None,
+                          on_stuck_raise=None,
+                          max_workers=2) == expected
+    assert threads == {main_thread}
@@ -52,18 +52,20 @@ def _get_qubit_row_col(qubit: QubitCoordinate) -> Tuple[int, int]:
         return qubit[0], qubit[1]
 
 
-def relative_luminance(color: np.ndarray) -> float:
+def relative_luminance(color: np.ndarray) -> Union[float, np.ndarray]:
     """Returns the relative luminance according to W3C specification.
 
     Spec: https://www.w3.org/TR/WCAG21/#dfn-relative-luminance.
 
     Args:
         color: a numpy array with the first 3 elements red, green, and blue
-            with values in [0, 1].
+            with values in [0, 1]. An array of colors is also accepted, in
+            which case the last axis holds the color components.
     Returns:
-        relative luminance of color in [0, 1].
+        relative luminance of color in [0, 1], or an array of the relative
+        luminances of the colors.
     """
-    rgb = color[:3]
+    rgb = color[..., :3]
     rgb = np.where(rgb <= .03928, rgb / 12.92, ((rgb + .055) / 1.055)**2.4)
     return rgb.dot([.2126, .7152, .0722])
 
@@ -71,12 +73,21 @@ def relative_luminance(color: np.ndarray) -> float:
 class Heatmap:
     """Distribution of a value in 2D qubit lattice as a color map."""
 
+    # Heatmaps are often created in bulk (e.g. one per subplot), and all of
+    # their attributes are known up front.
+    __slots__ = ('value_map', 'annot_map', 'annot_kwargs', 'url_map',
+                 'plot_colorbar', 'colorbar_location_options',
+                 'colorbar_options', 'colormap', 'vmin', 'vmax',
+                 '_boundary_tables')
+
     def __init__(self, value_map: ValueMap) -> None:
         self.set_value_map(value_map)
         self.unset_annotation()
         self.unset_url_map()
         self.set_colorbar()
         self.set_colormap()
+        self._boundary_tables: Optional[Tuple[Tuple[int, ...], np.ndarray,
+                                              np.ndarray]] = None
 
     def set_value_map(self, value_map: ValueMap) -> 'Heatmap':
         """Sets the values for each qubit.
@@ -86,8 +97,11 @@ class Heatmap:
         """
         # Fail fast if float() fails.
         # Keep the original value object for annotation.
+        # Qubits are normalized to (row, col) once here, so that later passes
+        # over the value map don't need to inspect their type.
         self.value_map = {
-            qubit: (float(value), value) for qubit, value in value_map.items()
+            _get_qubit_row_col(qubit): (float(value), value)
+            for qubit, value in value_map.items()
         }
         return self
 
@@ -119,8 +133,8 @@ class Heatmap:
             text_options: keyword arguments to matplotlib.text.Text().
         """
         self.annot_map = {
-            _get_qubit_row_col(qubit): format(value[1], annot_format)
-            for qubit, value in self.value_map.items()
+            row_col: format(value[1], annot_format)
+            for row_col, value in self.value_map.items()
         }
         self.annot_kwargs = text_options
         return self
@@ -128,6 +142,7 @@ class Heatmap:
     def unset_annotation(self) -> 'Heatmap':
         """Disables annotation. No texts are shown in cells."""
         self.annot_map = {}
+        self.annot_kwargs = {}
         return self
 
     def set_url_map(self, url_map: Mapping[QubitCoordinate, str]) -> 'Heatmap':
@@ -200,51 +215,88 @@ class Heatmap:
             pcolor_options: keyword arguments passed to ax.pcolor().
 
         Returns: a 2-tuple (mesh, value_table)
-            mesh: the collection of paths drawn and filled.
+            mesh: the collection of paths drawn and filled. Like other
+                matplotlib collections, its face colors are computed when
+                the figure is drawn.
             value_table: the 2-D pandas DataFrame of values constructed from
                 the value_map.
         """
+        mesh, values, (min_row, min_col) = self._plot(ax, pcolor_options)
+        height, width = values.shape
+        value_table = pd.DataFrame(values,
+                                   index=range(min_row, min_row + height),
+                                   columns=range(min_col, min_col + width))
+        return mesh, value_table
+
+    def plot_array(self, ax: plt.Axes, **pcolor_options: Any
+                  ) -> Tuple[mpl_collections.Collection, np.ndarray]:
+        """Plots the heatmap on the given Axes, without building a DataFrame.
+
+        Args:
+            ax: the Axes to draw on.
+            pcolor_options: keyword arguments passed to ax.pcolor().
+
+        Returns: a 2-tuple (mesh, values)
+            mesh: the collection of paths drawn and filled. Its face colors
+                are computed when the figure is drawn.
+            values: the 2-D numpy array of values constructed from the
+                value_map. Its first row and column correspond to the
+                smallest row and column in the value_map, and cells with no
+                value are np.nan.
+        """
+        mesh, values, _ = self._plot(ax, pcolor_options)
+        return mesh, values
+
+    def _plot(
+            self, ax: plt.Axes, pcolor_options: Dict[str, Any]
+    ) -> Tuple[mpl_collections.Collection, np.ndarray, Tuple[int, int]]:
+        """Plots the heatmap on the given Axes. Internal.
+
+        Returns:
+            The mesh, the 2-D array of values and the (row, col) of the first
+            cell of the array.
+        """
         # Find the boundary and size of the heatmap.
-        coordinate_list = [
-            _get_qubit_row_col(qubit) for qubit in self.value_map.keys()
-        ]
-        rows = [row for row, _ in coordinate_list]
-        cols = [col for _, col in coordinate_list]
-        min_row, max_row = min(rows), max(rows)
-        min_col, max_col = min(cols), max(cols)
+        coordinates = np.array(list(self.value_map.keys()), dtype=int)
+        min_row, min_col = (int(x) for x in coordinates.min(axis=0))
+        max_row, max_col = (int(x) for x in coordinates.max(axis=0))
         height, width = max_row - min_row + 1, max_col - min_col + 1
         # Construct the (height x width) table of values. Cells with no values
         # are filled with np.nan.
-        value_table = pd.DataFrame(np.nan,
-                                   index=range(min_row, max_row + 1),
-                                   columns=range(min_col, max_col + 1))
-        for qubit, (float_value, _) in self.value_map.items():
-            row, col = _get_qubit_row_col(qubit)
-            value_table[col][row] = float_value
+        row_indices = coordinates[:, 0] - min_row
+        col_indices = coordinates[:, 1] - min_col
+        values = np.full((height, width), np.nan)
+        values[row_indices, col_indices] = np.fromiter(
+            (float_value for float_value, _ in self.value_map.values()), float,
+            len(coordinates))
         # Construct the (height + 1) x (width + 1) cell boundary tables.
-        x_table = np.array([np.arange(min_col - 0.5, max_col + 1.5)] *
-                           (height + 1))
-        y_table = np.array([np.arange(min_row - 0.5, max_row + 1.5)] *
-                           (width + 1)).transpose()
+        x_table, y_table = self._cell_boundary_tables(min_row, max_row,
+                                                      min_col, max_col)
+
+        # The (row, col) of each non-nan cell, in the row-major order in which
+        # pcolor draws them.
+        cell_coordinates = [
+            (row, col) for row, col in (np.argwhere(~np.isnan(values)) +
+                                        [min_row, min_col]).tolist()
+        ]
 
         # Construct the URL array as an ordered list of URLs for non-nan cells.
         url_array = []  # type: List[str]
         if self.url_map:
             url_array = [
                 self.url_map.get((row, col), '')
-                for row, col in value_table.stack().index
+                for row, col in cell_coordinates
             ]
 
         # Plot the heatmap.
         mesh = ax.pcolor(x_table,
                          y_table,
-                         value_table,
+                         values,
                          vmin=self.vmin,
                          vmax=self.vmax,
                          cmap=self.colormap,
                          urls=url_array,
                          **pcolor_options)
-        mesh.update_scalarmappable()
         ax.set(xlabel='column', ylabel='row')
         ax.invert_yaxis()
         ax.xaxis.set_ticks(np.arange(min_col, max_col + 1))
@@ -254,9 +306,29 @@ class Heatmap:
             self._plot_colorbar(mesh, ax)
 
         if self.annot_map:
-            self._write_annotations(mesh, ax)
+            # The text colors depend on the face colors, which matplotlib
+            # otherwise only computes when drawing.
+            mesh.update_scalarmappable()
+            self._write_annotations(cell_coordinates, mesh, ax)
 
-        return mesh, value_table
+        return mesh, values, (min_row, min_col)
+
+    def _cell_boundary_tables(self, min_row: int, max_row: int, min_col: int,
+                              max_col: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the x and y coordinates of the cell corners. Internal.
+
+        The tables are read-only broadcast views, and are reused by subsequent
+        plots with the same boundary.
+        """
+        bounds = (min_row, max_row, min_col, max_col)
+        if self._boundary_tables is None or self._boundary_tables[0] != bounds:
+            shape = (max_row - min_row + 2, max_col - min_col + 2)
+            x_table = np.broadcast_to(np.arange(min_col - 0.5, max_col + 1.5),
+                                      shape)
+            y_table = np.broadcast_to(
+                np.arange(min_row - 0.5, max_row + 1.5)[:, np.newaxis], shape)
+            self._boundary_tables = (bounds, x_table, y_table)
+        return self._boundary_tables[1], self._boundary_tables[2]
 
     def _plot_colorbar(self, mappable: mpl.cm.ScalarMappable,
                        ax: plt.Axes) -> mpl.colorbar.Colorbar:
@@ -273,20 +345,17 @@ class Heatmap:
         colorbar_ax.tick_params(axis='y', direction='out')
         return colorbar
 
-    def _write_annotations(self, mesh: mpl_collections.Collection,
+    def _write_annotations(self, cell_coordinates: List[Tuple[int, int]],
+                           mesh: mpl_collections.Collection,
                            ax: plt.Axes) -> None:
         """Writes annotations to the center of cells. Internal."""
-        for path, facecolor in zip(mesh.get_paths(), mesh.get_facecolors()):
-            # Calculate the center of the cell, assuming that it is a square
-            # centered at (x=col, y=row).
-            vertices = path.vertices[:4]
-            row = int(round(np.mean([v[1] for v in vertices])))
-            col = int(round(np.mean([v[0] for v in vertices])))
+        # Pick the text color of every cell at once.
+        is_light = relative_luminance(np.asarray(mesh.get_facecolors())) > 0.4
+        for (row, col), light in zip(cell_coordinates, is_light):
             annotation = self.annot_map.get((row, col), '')
             if not annotation:
                 continue
-            face_luminance = relative_luminance(facecolor)
-            text_color = 'black' if face_luminance > 0.4 else 'white'
+            text_color = 'black' if light else 'white'
             text_kwargs = dict(color=text_color, ha="center", va="center")
             text_kwargs.update(self.annot_kwargs)
             ax.text(col, row, annotation, **text_kwargs)
@@ -31,6 +31,16 @@ def axes():
     return figure.add_subplot(111)
 
 
+def test_relative_luminance():
+    colors = np.array([[0, 0, 0, 1], [1, 1, 1, 1], [1, 0, 0, 0.5],
+                       [0.2, 0.6, 0.4, 1]])
+    luminances = heatmap.relative_luminance(colors)
+    assert luminances.shape == (4,)
+    np.testing.assert_allclose(luminances[:3], [0, 1, 0.2126])
+    for color, luminance in zip(colors, luminances):
+        assert np.isclose(heatmap.relative_luminance(color), luminance)
+
+
 @pytest.mark.parametrize('test_GridQubit', [True, False])
 def test_cells_positions(axes, test_GridQubit):
     row_col_list = ((0, 5), (8, 1), (7, 0), (13, 5), (1, 6), (3, 2), (2, 8))
@@ -51,6 +61,26 @@ def test_cells_positions(axes, test_GridQubit):
     assert found_qubits == set(row_col_list)
 
 
+def test_value_map_keys_are_normalized():
+    my_heatmap = heatmap.Heatmap({grid_qubit.GridQubit(1, 2): 3, (4, 5): '6'})
+    assert my_heatmap.value_map == {(1, 2): (3.0, 3), (4, 5): (6.0, '6')}
+
+
+def test_plot_array_matches_value_table(axes):
+    test_value_map = {(1, 2): 0.5, (3, 1): 1.5, (2, 4): -0.25}
+    my_heatmap = heatmap.Heatmap(test_value_map)
+    _, value_table = my_heatmap.plot(axes)
+    mesh, values = my_heatmap.plot_array(axes)
+
+    assert list(value_table.index) == [1, 2, 3]
+    assert list(value_table.columns) == [1, 2, 3, 4]
+    np.testing.assert_array_equal(values, value_table.values)
+    for (row, col), value in test_value_map.items():
+        assert values[row - 1, col - 1] == value
+    assert np.isnan(values).sum() == values.size - len(test_value_map)
+    assert len(mesh.get_paths()) == len(test_value_map)
+
+
 # Test colormaps are the first one in each category in
 # https://matplotlib.org/3.1.0/tutorials/colors/colormaps.html.
 @pytest.mark.parametrize(
@@ -64,6 +94,8 @@ def test_cell_colors(axes, colormap_name):
     random_heatmap = (heatmap.Heatmap(test_value_map).set_colormap(
         colormap_name, vmin=vmin, vmax=vmax))
     mesh, _ = random_heatmap.plot(axes)
+    # Face colors are otherwise only computed when the figure is drawn.
+    mesh.update_scalarmappable()
 
     colormap = mpl.cm.get_cmap(colormap_name)
     for path, facecolor in zip(mesh.get_paths(), mesh.get_facecolors()):
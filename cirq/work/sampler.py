@@ -13,7 +13,7 @@
 # limitations under the License.
 """Abstract base class for things sampling quantum circuits."""
 
-from typing import List, Union, TYPE_CHECKING
+from typing import List, Optional, Union, TYPE_CHECKING
 import abc
 import asyncio
 import threading
@@ -71,6 +71,54 @@ class Sampler(metaclass=abc.ABCMeta):
             resolver.
         """
 
+    def run_batch(
+            self,
+            programs: List[Union['cirq.Circuit', 'cirq.Schedule']],
+            params_list: Optional[List['cirq.Sweepable']] = None,
+            repetitions: Union[int, List[int]] = 1,
+    ) -> List[List['cirq.TrialResult']]:
+        """Runs the supplied circuits or schedules.
+
+        Each program is run with its own parameters and number of repetitions.
+        By default, this method calls `run_sweep` once per program. Child
+        classes that can amortize the cost of submitting many programs (for
+        example by sending them to a remote service in a single request) are
+        free to override it.
+
+        Args:
+            programs: The circuits or schedules to sample from.
+            params_list: Parameters to run with each program. If specified,
+                it must have the same length as `programs`. By default, each
+                program is run without parameters.
+            repetitions: The number of times to sample each program. If an
+                integer, the same number of repetitions is used for every
+                program. Otherwise it must have the same length as `programs`.
+
+        Returns:
+            A list with one entry per program. Each entry is the TrialResult
+            list of that program; one for each possible parameter resolver.
+
+        Raises:
+            ValueError: `params_list` or `repetitions` is a list whose length
+                differs from the number of programs.
+        """
+        if params_list is None:
+            params_list = [study.UnitSweep] * len(programs)
+        if len(params_list) != len(programs):
+            raise ValueError('len(programs) and len(params_list) must match. '
+                             'Got {} and {}.'.format(len(programs),
+                                                     len(params_list)))
+        if isinstance(repetitions, int):
+            repetitions = [repetitions] * len(programs)
+        if len(repetitions) != len(programs):
+            raise ValueError('len(programs) and len(repetitions) must match. '
+                             'Got {} and {}.'.format(len(programs),
+                                                     len(repetitions)))
+        return [
+            self.run_sweep(program, params=params, repetitions=reps)
+            for program, params, reps in zip(programs, params_list, repetitions)
+        ]
+
     async def run_async(self, program: Union['cirq.Circuit', 'cirq.Schedule'],
                         *, repetitions: int) -> 'cirq.TrialResult':
         """Asynchronously samples from the given Circuit or Schedule.
@@ -13,6 +13,9 @@
 # limitations under the License.
 """Tests for cirq.Sampler."""
 
+import pytest
+import sympy
+
 import cirq
 
 
@@ -27,3 +30,42 @@ def test_sampler_fail():
         cirq.Circuit(), repetitions=1),
                                            ValueError,
                                            match='test')
+
+
+def test_sampler_run_batch():
+    sampler = cirq.Simulator()
+    a = cirq.LineQubit(0)
+    circuit1 = cirq.Circuit.from_ops(
+        cirq.X(a)**sympy.Symbol('t'), cirq.measure(a, key='m'))
+    circuit2 = cirq.Circuit.from_ops(cirq.Y(a), cirq.measure(a, key='m'))
+    params1 = cirq.Points('t', [0.0, 1.0])
+    params2 = cirq.UnitSweep
+    results = sampler.run_batch([circuit1, circuit2],
+                                params_list=[params1, params2],
+                                repetitions=[1, 2])
+    assert len(results) == 2
+    assert [r.repetitions for r in results[0]] == [1, 1]
+    assert [r.measurements['m'].tolist() for r in results[0]] == [[[0]],
+                                                                 [[1]]]
+    assert [r.repetitions for r in results[1]] == [2]
+    assert results[1][0].measurements['m'].tolist() == [[1], [1]]
+
+
+def test_sampler_run_batch_default_params_and_repetitions():
+    sampler = cirq.Simulator()
+    a = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.X(a), cirq.measure(a, key='m'))
+    results = sampler.run_batch([circuit, circuit], repetitions=3)
+    assert len(results) == 2
+    for result_list in results:
+        assert len(result_list) == 1
+        assert result_list[0].measurements['m'].tolist() == [[1], [1], [1]]
+
+
+def test_sampler_run_batch_bad_input_lengths():
+    sampler = cirq.Simulator()
+    circuit = cirq.Circuit()
+    with pytest.raises(ValueError, match='params_list'):
+        sampler.run_batch([circuit], params_list=[cirq.UnitSweep] * 2)
+    with pytest.raises(ValueError, match='repetitions'):
+        sampler.run_batch([circuit], repetitions=[1, 2])